@@ -2,23 +2,38 @@ import fitz
 import os
 import json
 import re
+from parserCommon import TEXT_FLAGS, DEFAULT_CACHE_DIR, DisciplineCache, ParserPool
+
+_RE_WS = re.compile(r'\s+')
+_RE_SECTION = re.compile(r'\d+\.\s*Раздел\s*\d+\.')
+_RE_THEME = re.compile(r'Тема\s*\d+(?:\.\d+)*(?:[.:])?')
 
 
 class ParserMTUCI:
-    def __init__(self, universityDirName: str):
+    def __init__(self, universityDirName: str, cacheDirName: str = DEFAULT_CACHE_DIR):
         self.__universityDirName = universityDirName
         self.__directionsOfStudy = {}
+        # Кэш лежит вне папки с РПД, поэтому она может быть доступна только для чтения
+        self.__cacheDirName = cacheDirName
+        self.__cache = DisciplineCache(cacheDirName, type(self).__name__)
 
-        self.__titleOfDocument = ["Рабочая программа дисциплины  ", "Рабочая программа элективной дисциплины  "]
-        self.__textForPreviousDisciplines = ["формируются у  обучающихся в результате изучения дисциплины ",
+        # Маркеры пишутся через одиночные пробелы: при компиляции любой пробел допускает произвольный отступ
+        self.__titleOfDocument = ["Рабочая программа дисциплины", "Рабочая программа элективной дисциплины"]
+        self.__textForPreviousDisciplines = ["формируются у обучающихся в результате изучения дисциплины",
                                              "Для освоения дисциплины необходимы навыки, приобретенные в результате "
-                                             "изучения  таких дисциплин как"]
-        self.__textForEducationalUnits = ["индикаторов   компетенций  ", "индикаторов  компетенций  ",
-                                          "индикаторов  компетенции  ", "индикаторов   компетенции  ",
-                                          "индикаторов  компетенций"]
+                                             "изучения таких дисциплин как"]
+        self.__textForEducationalUnits = ["индикаторов компетенций", "индикаторов компетенции"]
+        self.__textForDirection = "Направление подготовки"
         self.__endTextForTopics = ['Лекция', 'Лабораторная работа', 'Практическая работа', '№ п/п', 'Практическое занятие']
         self.__endTextForEducationalUnits = ('5. Учебно-методическое')
 
+        self.__titlePattern = self.__compileMarkers(self.__titleOfDocument)
+        self.__previousDisciplinesPattern = self.__compileMarkers(self.__textForPreviousDisciplines)
+        self.__educationalUnitsPattern = self.__compileMarkers(self.__textForEducationalUnits)
+        self.__endUnitsPattern = self.__compileMarkers([self.__endTextForEducationalUnits])
+        self.__directionPattern = self.__compileMarkers([self.__textForDirection])
+        self.__endTopicsPattern = re.compile('|'.join(map(re.escape, self.__endTextForTopics)))
+
     def loadDirectionOfStudy(self, dirOfDirection: str) -> bool:
         if dirOfDirection in self.__directionsOfStudy:
             return True
@@ -27,11 +42,12 @@ class ParserMTUCI:
         if not os.path.exists(directory) or not os.path.isdir(directory):
             return False
 
+        filePaths = [os.path.join(directory, fileNameDiscipline) for fileNameDiscipline in os.listdir(directory)]
+        filePaths = [filePath for filePath in filePaths if os.path.isfile(filePath)]
+
         listOfDisciplines = []
-        for fileNameDiscipline in os.listdir(directory):
-            filePathDiscipline = os.path.join(directory, fileNameDiscipline)
-            if os.path.isfile(filePathDiscipline):
-                discipline, arguments = self.readTextFromFileDiscipline(filePathDiscipline)
+        with ParserPool(self, (self.__universityDirName, self.__cacheDirName), len(filePaths)) as pool:
+            for discipline, arguments in pool.map(ParserMTUCI.readTextFromFileDiscipline, filePaths):
                 if discipline and arguments:
                     listOfDisciplines.append({discipline: arguments})
         self.__directionsOfStudy[dirOfDirection] = listOfDisciplines
@@ -53,17 +69,6 @@ class ParserMTUCI:
         except Exception as e:
             return False
 
-    @staticmethod
-    def __refactorText(text: str) -> str:
-        text = re.sub(r'\n(?=[А-ЯA-Z])', '$', text)
-        text = re.sub(r'\d+\.\d+', '', text)
-        text = re.sub(r'Темы:', '', text)
-        text = re.sub(r'\s+', ' ', text).strip()
-        text = re.sub(r'\d+\)\s*(\S+)', '', text)
-        text = text.replace(". ", "$").replace(";", "$")
-        text = text.replace(".", "")
-        return text
-
     @staticmethod
     def __checkText(text: str) -> bool:
         flag = False
@@ -74,102 +79,109 @@ class ParserMTUCI:
         return flag and len(text.strip()) > 2
 
     @staticmethod
-    def __cut_by_words(text: str, words: list[str]) -> str:
-        positions = [
-            text.find(word)
-            for word in words
-            if text.find(word) != -1
-        ]
-        if not positions:
+    def __compileMarkers(markers: list[str]) -> re.Pattern:
+        alternatives = dict.fromkeys(r'\s+'.join(map(re.escape, marker.split())) for marker in markers)
+        return re.compile('(?:' + '|'.join(alternatives) + r')\s*')
+
+    @staticmethod
+    def __cut_by_words(text: str, wordsPattern: re.Pattern) -> str:
+        match = wordsPattern.search(text)
+        if not match:
             return text
-        return text[:min(positions)].strip()
+        return text[:match.start()].strip()
 
     def readTextFromFileDiscipline(self, filePathDiscipline: str) -> tuple:
+        cached = self.__cache.get(filePathDiscipline)
+        if cached is not None:
+            disciplineName, arguments = cached
+            return disciplineName, arguments
+
+        disciplineName, arguments = self.__parseFileDiscipline(filePathDiscipline)
+        if disciplineName and arguments:
+            self.__cache.put(filePathDiscipline, [disciplineName, arguments])
+        return disciplineName, arguments
+
+    def __readTextUntilEndOfUnits(self, filePathDiscipline: str) -> str:
+        pages = []
+        windowStart = 0
+        unitsPosition = None
+        with fitz.open(filePathDiscipline) as document:
+            for page in document:
+                if len(pages) > 1:
+                    windowStart += len(pages[-2]) + 1
+                pages.append(page.get_text("text", flags=TEXT_FLAGS))
+                window = "\n".join(pages[-2:])
+                if unitsPosition is None:
+                    match = self.__educationalUnitsPattern.search(window)
+                    if match:
+                        unitsPosition = windowStart + match.end()
+                if unitsPosition is not None and \
+                        self.__endUnitsPattern.search(window, max(unitsPosition - windowStart, 0)):
+                    break
+        return "\n".join(pages)
+
+    def __parseFileDiscipline(self, filePathDiscipline: str) -> tuple:
         try:
-            fullText = ""
-            document = fitz.open(filePathDiscipline)
-            linesBoldFont = []
-
-            for page_num in range(len(document)):
-                page = document[page_num]
-                textPage = page.get_text("dict")
-                for block in textPage.get("blocks", []):
-                    if "lines" in block:
-                        for line in block["lines"]:
-                            for span in line["spans"]:
-                                fullText += span["text"] + " "
-                                if span["flags"] == 20:
-                                    linesBoldFont.append(span["text"].strip())
-                        fullText += "\n"
-                fullText += "\n"
-            document.close()
+            fullText = self.__readTextUntilEndOfUnits(filePathDiscipline)
 
             disciplineName = ''
-            for i in range(len(self.__titleOfDocument)):
-                indexOfNameDiscipline = fullText.find(self.__titleOfDocument[i])
-                if indexOfNameDiscipline != -1:
-                    disciplineName = fullText[indexOfNameDiscipline + len(self.__titleOfDocument[i]):]
-                    disciplineName = disciplineName[1:disciplineName.find("Направление подготовки")].strip()
-                    if len(disciplineName) > 200:
-                        disciplineName = disciplineName.split("\n")[0]
-                    disciplineName = re.sub(r"\s+", " ", disciplineName)
-                    disciplineName = disciplineName.lower()
+            match = self.__titlePattern.search(fullText)
+            if match:
+                disciplineName = self.__cut_by_words(fullText[match.end():], self.__directionPattern).strip()
+                if len(disciplineName) > 200:
+                    disciplineName = disciplineName.split("\n")[0]
+                disciplineName = _RE_WS.sub(" ", disciplineName)
+                disciplineName = disciplineName.lower()
 
             if disciplineName == '':
                 print(f"{filePathDiscipline}: this is not discipline!")
                 return None, None
 
             listOfPreviousDisciplines = []
-            for i in range(len(self.__textForPreviousDisciplines)):
-                indexOfPreviousDisciplines = fullText.find(self.__textForPreviousDisciplines[i])
-                if indexOfPreviousDisciplines != -1:
-                    subText = fullText[indexOfPreviousDisciplines + len(self.__textForPreviousDisciplines[i]):]
-                    subText = subText[:subText.find(".")]
-                    for discipline in subText.split(", "):
-                        if self.__checkText(discipline):
-                            listOfPreviousDisciplines.append(discipline.strip(" ««»").replace("  ", " "))
-                    break
+            match = self.__previousDisciplinesPattern.search(fullText)
+            if match:
+                subText = fullText[match.end():]
+                subText = _RE_WS.sub(" ", subText[:subText.find(".")])
+                for discipline in subText.split(", "):
+                    if self.__checkText(discipline):
+                        listOfPreviousDisciplines.append(discipline.strip(" ««»").replace("  ", " "))
 
             resultForAllTopics = {}
-            for i in range(len(self.__textForEducationalUnits)):
-                indexOfEducationalUnits = fullText.find(self.__textForEducationalUnits[i])
-                if indexOfEducationalUnits != -1:
-                    subText = fullText[indexOfEducationalUnits + len(self.__textForEducationalUnits[i]):]
-                    subText = re.sub(r"\s+", " ", subText)
-                    subText = subText[:subText.find(self.__endTextForEducationalUnits)]
-                    parts = re.split(r'(\d+\.\s*Раздел\s*\d+\.)', subText)
-
-                    sections = {}
-                    for i in range(1, len(parts), 2):
-                        section_header = parts[i]
-                        section_body = parts[i + 1]
-
-                        regex_list = [r'Тема\s*\d+(?:\.\d+)*(?:[.:])?']
-                        pattern = '(' + '|'.join(regex_list) + ')'
-
-                        themes_parts = re.split(pattern, section_body)
-                        section_name = themes_parts[0].strip()
-                        if not section_name:
-                            section_name = section_header.strip()
-
-                        themes = []
-                        if re.search(pattern, section_body):
-                            for j in range(1, len(themes_parts), 2):
-                                theme_title = themes_parts[j] + themes_parts[j + 1]
-                                theme_title = self.__cut_by_words(theme_title, self.__endTextForTopics)
-                                for r in regex_list:
-                                    theme_title = re.sub(r'^' + r + r'\s*', '', theme_title)
-                                theme_title = theme_title.strip(". ")
-                                if not theme_title == "":
-                                    themes.append(theme_title)
-                            sections[section_name] = themes
-
-                        else:
-                            section_name = self.__cut_by_words(section_name, self.__endTextForTopics)
-                            sections[section_name] = []
-
-                    resultForAllTopics = sections
-                    break
+            match = self.__educationalUnitsPattern.search(fullText)
+            if match:
+                subText = fullText[match.end():]
+                subText = _RE_WS.sub(" ", subText)
+                subText = subText[:subText.find(self.__endTextForEducationalUnits)]
+                section_matches = list(_RE_SECTION.finditer(subText))
+
+                sections = {}
+                for i, section_match in enumerate(section_matches):
+                    section_end = section_matches[i + 1].start() if i + 1 < len(section_matches) else len(subText)
+                    section_header = section_match.group()
+                    section_body = subText[section_match.end():section_end]
+
+                    theme_matches = list(_RE_THEME.finditer(section_body))
+                    section_name = section_body[:theme_matches[0].start()] if theme_matches else section_body
+                    section_name = section_name.strip()
+                    if not section_name:
+                        section_name = section_header.strip()
+
+                    themes = []
+                    if theme_matches:
+                        for j, theme_match in enumerate(theme_matches):
+                            theme_end = theme_matches[j + 1].start() if j + 1 < len(theme_matches) else len(section_body)
+                            theme_title = section_body[theme_match.end():theme_end]
+                            theme_title = self.__cut_by_words(theme_title, self.__endTopicsPattern)
+                            theme_title = theme_title.strip(". ")
+                            if not theme_title == "":
+                                themes.append(theme_title)
+                        sections[section_name] = themes
+
+                    else:
+                        section_name = self.__cut_by_words(section_name, self.__endTopicsPattern)
+                        sections[section_name] = []
+
+                resultForAllTopics = sections
 
             return disciplineName, {
                 "previousDisciplines": listOfPreviousDisciplines,
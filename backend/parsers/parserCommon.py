@@ -0,0 +1,170 @@
+"""
+Общие для парсеров РПД настройки извлечения текста из PDF, кэш результатов разбора и пул процессов для чтения файлов
+"""
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import hashlib
+import json
+import os
+
+import fitz
+
+# Флаги режима "text": только обрезка по странице, поэтому лигатуры раскладываются,
+# а спец-пробелы приводятся к обычным
+TEXT_FLAGS = fitz.TEXT_MEDIABOX_CLIP
+
+# Версия формата кэша: увеличивать при любом изменении разбора, чтобы старые записи не использовались
+CACHE_VERSION = 1
+# Каталог кэша по умолчанию: в пользовательском кэше, а не в дереве входных PDF файлов
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                                 "eduprogram-parsers")
+
+# Разбор PDF нагружает процессор, но каждый процесс пула долго запускается и держит в памяти
+# свой экземпляр MuPDF и парсера, поэтому больше 4 процессов почти не ускоряет загрузку
+MAX_WORKERS = 4
+# Меньше файлов быстрее прочитать в текущем процессе, чем запускать пул
+MIN_FILES_FOR_POOL = 8
+
+
+def muteMupdfErrors() -> tuple:
+    """
+    Отключает печать ошибок и предупреждений MuPDF о битых PDF в текущем процессе
+    Ошибки открытия файла все равно приходят исключениями
+    Returns:
+        прежние значения настроек для restoreMupdfErrors
+    """
+    previous = (fitz.TOOLS.mupdf_display_errors(), fitz.TOOLS.mupdf_display_warnings())
+    fitz.TOOLS.mupdf_display_errors(False)
+    fitz.TOOLS.mupdf_display_warnings(False)
+    return previous
+
+
+def restoreMupdfErrors(previous: tuple) -> None:
+    """
+    Возвращает настройки печати ошибок и предупреждений MuPDF, сохраненные muteMupdfErrors
+    """
+    displayErrors, displayWarnings = previous
+    fitz.TOOLS.mupdf_display_errors(displayErrors)
+    fitz.TOOLS.mupdf_display_warnings(displayWarnings)
+
+
+class DisciplineCache:
+    """
+    Кэш результатов разбора PDF файлов на диске, по одному JSON файлу на PDF файл
+    Ключ зависит от версии кэша, имени парсера, пути, времени изменения и размера PDF файла
+    Если каталог кэша недоступен для записи, разбор работает как без кэша
+    """
+
+    def __init__(self, cacheDir: str, namespace: str, version: int = CACHE_VERSION):
+        """
+        Args:
+            cacheDir: каталог для файлов кэша, создается при первой записи
+            namespace: имя парсера, чтобы разные парсеры не делили записи
+            version: версия формата кэша
+        """
+        self.__cacheDir = cacheDir
+        self.__keyPrefix = f"{version}{namespace}"
+
+    def __getCacheFilePath(self, filePath: str) -> str:
+        """
+        Raises:
+            OSError: если PDF файл недоступен
+        """
+        key = f"{self.__keyPrefix}{filePath}{os.path.getmtime(filePath)}{os.path.getsize(filePath)}"
+        return os.path.join(self.__cacheDir, hashlib.blake2b(key.encode()).hexdigest() + ".json")
+
+    def get(self, filePath: str):
+        """
+        Returns:
+            сохраненный результат разбора или None, если его нет, он устарел или PDF файл недоступен
+        """
+        try:
+            with open(self.__getCacheFilePath(filePath), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, filePath: str, value) -> None:
+        """
+        Сохраняет результат разбора; ошибки записи не пробрасываются
+        """
+        try:
+            cacheFilePath = self.__getCacheFilePath(filePath)
+            os.makedirs(self.__cacheDir, exist_ok=True)
+            with open(cacheFilePath, 'w', encoding='utf-8') as file:
+                json.dump(value, file, ensure_ascii=False)
+        except OSError:
+            pass
+
+
+class ParserPool:
+    """
+    Пул процессов для чтения PDF файлов, один на запуск парсера
+    В каждом процессе пула создается собственный экземпляр класса парсера
+    Если файлов мало или доступно одно ядро, файлы читаются последовательно в текущем процессе
+    """
+
+    def __init__(self, parser, parserArgs: tuple, fileCount: int, muteErrors: bool = False):
+        """
+        Args:
+            parser: экземпляр парсера, используется при последовательном чтении
+            parserArgs: аргументы конструктора парсера для процессов пула
+            fileCount: сколько всего файлов будет прочитано через пул
+            muteErrors: отключить печать ошибок и предупреждений MuPDF на время чтения
+        """
+        self.__parser = parser
+        self.__parserArgs = parserArgs
+        self.__muteErrors = muteErrors
+        self.__workers = min(os.cpu_count() or 1, fileCount, MAX_WORKERS) if fileCount >= MIN_FILES_FOR_POOL else 1
+        self.__executor = None
+        self.__previousMute = None
+
+    def __enter__(self):
+        if self.__workers > 1:
+            self.__executor = ProcessPoolExecutor(max_workers=self.__workers, initializer=_initWorker,
+                                                  initargs=(type(self.__parser), self.__parserArgs, self.__muteErrors))
+        elif self.__muteErrors:
+            self.__previousMute = muteMupdfErrors()
+        return self
+
+    def __exit__(self, *excInfo):
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+        if self.__previousMute is not None:
+            restoreMupdfErrors(self.__previousMute)
+            self.__previousMute = None
+        return False
+
+    def map(self, method, filePaths: list):
+        """
+        Читает файлы методом парсера
+        Args:
+            method: метод класса парсера, принимающий путь к файлу, например ParserGUAP._read_discipline_from_file
+            filePaths: пути к файлам
+        Returns:
+            итератор результатов в порядке filePaths
+        """
+        if self.__executor is None:
+            return (method(self.__parser, filePath) for filePath in filePaths)
+        return self.__executor.map(_callWorker, repeat(method), filePaths)
+
+
+_workerParser = None
+
+
+def _initWorker(parserClass, parserArgs: tuple, muteErrors: bool) -> None:
+    """
+    Создает парсер в процессе пула (вызывается один раз на процесс)
+    """
+    global _workerParser
+    if muteErrors:
+        muteMupdfErrors()
+    _workerParser = parserClass(*parserArgs)
+
+
+def _callWorker(method, filePath: str):
+    """
+    Читает один файл парсером процесса пула
+    """
+    return method(_workerParser, filePath)
@@ -4,6 +4,13 @@ import os
 import json
 import re
 from tqdm import tqdm
+from parserCommon import TEXT_FLAGS, DEFAULT_CACHE_DIR, DisciplineCache, ParserPool
+
+_RE_BULLET = re.compile(r'^[−–•\*\-\s]+')
+_RE_BULLET_NUM = re.compile(r'^[−–•\*\-\d+\.\s]+', re.MULTILINE)
+_RE_QUOTED = re.compile(r'[«"]\s*([^»"]+?)\s*[»"]')
+_RE_DIGIT = re.compile(r'\d')
+_RE_FILE_NUM_SUFFIX = re.compile(r'_\d+$')
 
 
 class ParserGUAP:
@@ -34,16 +41,41 @@ class ParserGUAP:
         parser.save_as_json("output.json")
     """
 
-    def __init__(self, university_dir_name: str):
+    _NAME_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+        r'РАБОЧАЯ ПРОГРАММА ДИСЦИПЛИНЫ\s*[«"]\s*([^»"]+)\s*[»"]',
+        r'Дисциплина\s*[«"]\s*([^»"]+)\s*[»"]',
+        r'Дисциплина\s+([А-Яа-яA-Za-z\s\-]+?)\s+входит',
+        r'Дисциплина\s+([А-Яа-яA-Za-z\s\-]+?)\s+реализуется',
+    )]
+
+    _SECTION_PATTERN = re.compile(r'2\.\s*Место дисциплины в структуре ОП(.*?)(?=\n\d+\.|\Z)',
+                                  re.DOTALL | re.IGNORECASE)
+
+    _PREV_PATTERNS = [re.compile(p, re.DOTALL | re.IGNORECASE) for p in (
+        r'базироваться на знаниях.*?при изучении следующих дисциплин:(.*?)(?=\n\n|\n[A-ZА-Я]|\Z)',
+        r'может базироваться на знаниях.*?следующих дисциплин:(.*?)(?=\n\n|\n\d+\.|\Z)',
+    )]
+
+    _NEXT_PATTERNS = [re.compile(p, re.DOTALL | re.IGNORECASE) for p in (
+        r'использоваться при изучении других дисциплин:(.*?)(?=\n\n|\n\d+\.|\Z)',
+        r'могут использоваться при изучении других дисциплин:(.*?)(?=\n\n|\n\d+\.|\Z)',
+        r'Знания.*?используются при изучении других дисциплин:(.*?)(?=\n\n|\n\d+\.|\Z)',
+    )]
+
+    def __init__(self, university_dir_name: str, cache_dir_name: str = DEFAULT_CACHE_DIR):
         """
         Инициализация парсера.
 
         Args:
             university_dir_name (str): Путь к корневой директории с PDF файлами.
                                       Может быть абсолютным или относительным.
+            cache_dir_name (str): Каталог кэша результатов разбора.
+                                  По умолчанию находится вне директории с PDF файлами.
         """
         self.__university_dir_name = university_dir_name
         self.__directions_of_study = {}  # {направление: {дисциплина: данные}}
+        self.__cache_dir_name = cache_dir_name
+        self.__cache = DisciplineCache(cache_dir_name, type(self).__name__)
 
         self.__title_marker = "РАБОЧАЯ ПРОГРАММА ДИСЦИПЛИНЫ"
 
@@ -71,6 +103,10 @@ class ParserGUAP:
             "над", "под", "об", "от", "так", "также", "а", "но", "или"
         ]
 
+        # Нормализованные копии для _is_valid_discipline, чтобы не пересчитывать их на каждый элемент
+        self.__stop_words_lower = tuple(dict.fromkeys(word.lower() for word in self.__stop_words if word))
+        self.__bad_starts_set = frozenset(self.__bad_starts)
+
     def load_all_directions(self) -> dict:
         """
         Автоматически загружает все направления из корневой директории.
@@ -91,51 +127,69 @@ class ParserGUAP:
             return {}
 
         try:
-            items = os.listdir(self.__university_dir_name)
+            with os.scandir(self.__university_dir_name) as entries:
+                dirs = [entry.name for entry in entries if entry.is_dir() and not entry.name.startswith('.')]
         except PermissionError:
             print(f"Нет доступа к директории: {self.__university_dir_name}")
             return {}
 
-        for item in tqdm(items, desc="Обработка направлений", unit="папка", colour="green"):
-            if os.path.isdir(os.path.join(self.__university_dir_name, item)):
-                self._load_single_direction(item)
+        files_of_directions = {item: self._list_direction_files(item) for item in dirs}
+        file_count = sum(len(file_paths) for file_paths in files_of_directions.values())
+
+        # Один пул на все направления: процессы запускаются один раз за загрузку
+        with ParserPool(self, (self.__university_dir_name, self.__cache_dir_name), file_count, muteErrors=True) as pool:
+            for item in tqdm(dirs, desc="Обработка направлений", unit="папка", colour="green"):
+                self._load_single_direction(item, files_of_directions[item], pool)
 
         if not self.__directions_of_study:
             print("В корневой директории не найдено ни одного направления с PDF файлами")
 
         return self.__directions_of_study
 
-    def _load_single_direction(self, dir_of_direction: str) -> bool:
+    def _list_direction_files(self, dir_of_direction: str) -> list:
         """
-        Загружает одно направление.
+        Находит PDF файлы направления.
 
         Args:
             dir_of_direction (str): Имя папки с PDF файлами направления
 
         Returns:
-            bool: True если загружена хотя бы одна дисциплина, иначе False
-
-        Note:
-            - Пропускает папки без PDF файлов
-            - При ошибках доступа выводит сообщение и возвращает False
-            - Использует вложенный прогресс-бар для отслеживания обработки файлов
+            list: Полные пути к PDF файлам.
+                  Пустой список, если нет доступа к папке.
         """
         directory = os.path.join(self.__university_dir_name, dir_of_direction)
 
         try:
-            pdf_files = [f for f in os.listdir(directory)
-                         if f.lower().endswith('.pdf') and os.path.isfile(os.path.join(directory, f))]
+            with os.scandir(directory) as entries:
+                return [entry.path for entry in entries
+                        if entry.name.lower().endswith('.pdf') and entry.is_file()]
         except PermissionError:
             print(f"Нет доступа к папке: {dir_of_direction}")
-            return False
+            return []
+
+    def _load_single_direction(self, dir_of_direction: str, file_paths: list, pool: ParserPool) -> bool:
+        """
+        Загружает одно направление.
+
+        Args:
+            dir_of_direction (str): Имя папки с PDF файлами направления
+            file_paths (list): Полные пути к PDF файлам направления
+            pool (ParserPool): Пул, через который читаются файлы
+
+        Returns:
+            bool: True если загружена хотя бы одна дисциплина, иначе False
 
-        if not pdf_files:
+        Note:
+            - Пропускает папки без PDF файлов
+            - Использует вложенный прогресс-бар для отслеживания обработки файлов
+        """
+        if not file_paths:
             return False
 
         disciplines_dict = {}
-        for file_name in tqdm(pdf_files, desc=f"  {dir_of_direction}", unit="файл", colour="green", leave=False):
-            file_path = os.path.join(directory, file_name)
-            discipline_data = self._read_discipline_from_file(file_path)
+        results = pool.map(ParserGUAP._read_discipline_from_file, file_paths)
+        for discipline_data in tqdm(results, total=len(file_paths), desc=f"  {dir_of_direction}",
+                                    unit="файл", colour="green", leave=False):
             if discipline_data:
                 disciplines_dict.update(discipline_data)
 
@@ -146,7 +200,30 @@ class ParserGUAP:
 
     def _read_discipline_from_file(self, file_path: str) -> dict[Any, Any] | None:
         """
-        Прочитать данные дисциплины из PDF файла.
+        Прочитать данные дисциплины из PDF файла с использованием кэша.
+
+        Args:
+            file_path (str): Полный путь к PDF файлу
+
+        Returns:
+            dict: Словарь {название_дисциплины: данные} или None в случае ошибки
+
+        Note:
+            - Если PDF файл не менялся с прошлого запуска, результат берется из кэша
+            - Успешный результат разбора сохраняется в кэш
+        """
+        discipline_data = self.__cache.get(file_path)
+        if discipline_data is not None:
+            return discipline_data
+
+        discipline_data = self._parse_discipline_file(file_path)
+        if discipline_data:
+            self.__cache.put(file_path, discipline_data)
+        return discipline_data
+
+    def _parse_discipline_file(self, file_path: str) -> dict[Any, Any] | None:
+        """
+        Разобрать PDF файл дисциплины.
 
         Args:
             file_path (str): Полный путь к PDF файлу
@@ -160,16 +237,14 @@ class ParserGUAP:
             - Возвращает None, если не удалось извлечь название дисциплины
         """
         try:
-            full_text = ""
-            doc = pymupdf.open(file_path)
-
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                page_text = page.get_text()
-                if page_text:
-                    full_text += page_text + "\n"
-
-            doc.close()
+            parts = []
+            with pymupdf.open(file_path, filetype="pdf") as doc:
+                for page in doc:
+                    page_text = page.get_text("text", flags=TEXT_FLAGS)
+                    if page_text:
+                        parts.append(page_text)
+                        parts.append("\n")
+            full_text = "".join(parts)
 
             discipline_name = self._extract_discipline_name(full_text, file_path)
             if not discipline_name:
@@ -204,23 +279,16 @@ class ParserGUAP:
         Returns:
             str: Название дисциплины или пустая строка, если не найдено
         """
-        patterns = [
-            r'РАБОЧАЯ ПРОГРАММА ДИСЦИПЛИНЫ\s*[«"]\s*([^»"]+)\s*[»"]',
-            r'Дисциплина\s*[«"]\s*([^»"]+)\s*[»"]',
-            r'Дисциплина\s+([А-Яа-яA-Za-z\s\-]+?)\s+входит',
-            r'Дисциплина\s+([А-Яа-яA-Za-z\s\-]+?)\s+реализуется'
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in self._NAME_PATTERNS:
+            match = pattern.search(text)
             if match:
                 name = self._clean_text(match.group(1))
                 if name and len(name) > 3:
                     return name
 
         filename = os.path.splitext(os.path.basename(file_path))[0]
-        filename = re.sub(r'^rpd_', '', filename)
-        filename = re.sub(r'_\d+$', '', filename)
+        filename = filename.removeprefix('rpd_')
+        filename = _RE_FILE_NUM_SUFFIX.sub('', filename)
         return filename.replace('_', ' ').title()
 
     def _extract_disciplines_lists(self, text: str) -> tuple:
@@ -237,35 +305,23 @@ class ParserGUAP:
         prev_list = []
         next_list = []
 
-        section_pattern = r'2\.\s*Место дисциплины в структуре ОП(.*?)(?=\n\d+\.|\Z)'
-        section_match = re.search(section_pattern, text, re.DOTALL | re.IGNORECASE)
+        section_match = self._SECTION_PATTERN.search(text)
 
         if not section_match:
             return prev_list, next_list
 
         section_text = section_match.group(1)
 
-        prev_patterns = [
-            r'базироваться на знаниях.*?при изучении следующих дисциплин:(.*?)(?=\n\n|\n[A-ZА-Я]|\Z)',
-            r'может базироваться на знаниях.*?следующих дисциплин:(.*?)(?=\n\n|\n\d+\.|\Z)',
-        ]
-
-        for pattern in prev_patterns:
-            prev_match = re.search(pattern, section_text, re.DOTALL | re.IGNORECASE)
+        for pattern in self._PREV_PATTERNS:
+            prev_match = pattern.search(section_text)
             if prev_match:
                 prev_block = prev_match.group(1)
                 prev_list = self._extract_list_items(prev_block)
                 if prev_list:
                     break
 
-        next_patterns = [
-            r'использоваться при изучении других дисциплин:(.*?)(?=\n\n|\n\d+\.|\Z)',
-            r'могут использоваться при изучении других дисциплин:(.*?)(?=\n\n|\n\d+\.|\Z)',
-            r'Знания.*?используются при изучении других дисциплин:(.*?)(?=\n\n|\n\d+\.|\Z)',
-        ]
-
-        for pattern in next_patterns:
-            next_match = re.search(pattern, section_text, re.DOTALL | re.IGNORECASE)
+        for pattern in self._NEXT_PATTERNS:
+            next_match = pattern.search(section_text)
             if next_match:
                 next_block = next_match.group(1)
                 next_list = self._extract_list_items(next_block)
@@ -290,19 +346,17 @@ class ParserGUAP:
         """
         items = []
 
-        text_block = re.sub(r'^[−–•\*\-\s]+', '', text_block)
+        text_block = _RE_BULLET.sub('', text_block)
 
-        quoted = re.findall(r'[«"]\s*([^»"]+?)\s*[»"]', text_block)
+        quoted = _RE_QUOTED.findall(text_block)
         items.extend([q.strip() for q in quoted if q.strip()])
 
-        lines = text_block.split('\n')
-        for line in lines:
-            line = line.strip()
-            line = re.sub(r'^[−–•\*\-\d+\.\s]+', '', line)
-            line = line.strip(' ,.;:«»"')
+        # Маркеры и номера снимаются со всех строк одним проходом по блоку
+        for line in _RE_BULLET_NUM.sub('', text_block).split('\n'):
+            line = line.strip().strip(' ,.;:«»"')
 
             if line and len(line) > 3:
-                if ',' in line and not re.search(r'\d', line):
+                if ',' in line and not _RE_DIGIT.search(line):
                     parts = [p.strip(' «»"') for p in line.split(',')]
                     items.extend([p for p in parts if p])
                 else:
@@ -323,9 +377,7 @@ class ParserGUAP:
         if not text:
             return text
 
-        text = text.replace('\n', ' ').replace('\r', '')
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
+        return ' '.join(text.replace('\r', '').split())
 
     def _is_valid_discipline(self, text: str) -> bool:
         """
@@ -342,12 +394,13 @@ class ParserGUAP:
 
         text_lower = text.lower()
 
-        for word in self.__stop_words:
-            if word.lower() in text_lower:
+        for word in self.__stop_words_lower:
+            if word in text_lower:
                 return False
 
-        first_word = text_lower.split()[0] if text_lower.split() else ""
-        if first_word in self.__bad_starts:
+        words = text_lower.split()
+        first_word = words[0] if words else ""
+        if first_word in self.__bad_starts_set:
             return False
 
         return True
@@ -362,12 +415,12 @@ class ParserGUAP:
         Returns:
             list: Очищенный список уникальных названий
         """
-        cleaned = []
-        seen = set()
+        # Нормализованная форма -> первое встреченное написание
+        cleaned = {}
 
         for item in items:
             item = item.strip()
-            item = re.sub(r'^[−–•\*\-\s]+', '', item)
+            item = _RE_BULLET.sub('', item)
             item = item.strip(' ,.;:«»"\'')
 
             if item and len(item) > 1:
@@ -379,14 +432,9 @@ class ParserGUAP:
             if not self._is_valid_discipline(item):
                 continue
 
-            normalized = re.sub(r'\s+', '', item.lower())
-            if normalized in seen:
-                continue
-
-            seen.add(normalized)
-            cleaned.append(item)
+            cleaned.setdefault(''.join(item.lower().split()), item)
 
-        return sorted(cleaned)
+        return sorted(cleaned.values())
 
     def _remove_intersection(self, prev_list: list, next_list: list) -> tuple:
         """
@@ -2,6 +2,34 @@ import fitz
 import os
 import json
 import re
+from parserCommon import TEXT_FLAGS, ParserPool
+
+# Юникод-символы пробелов, которые часто встречаются в PDF
+_PDF_SPACES = (
+    "\u00A0",  # неразрывный пробел
+    "\u2000", "\u2001", "\u2002", "\u2003", "\u2004",  # пробелы разной ширины
+    "\u2005", "\u2006", "\u2007", "\u2008", "\u2009", "\u200A",
+    "\u202F", "\u205F", "\u3000",  # узкие и широкие пробелы
+    "\u00AD",  # мягкий перенос (soft hyphen)
+    "\u200B"  # zero-width space
+)
+
+_RE_WS = re.compile(r'\s+')
+# Серия из обычных и спец-пробелов PDF
+_RE_SPACES = re.compile("[ " + "".join(_PDF_SPACES) + "]+")
+_RE_QUOTED = re.compile(r'«(.*?)»')
+_RE_THEME = re.compile(r'тема(?:\s*\d+(?:\.\d+)*\.?)?\s*', re.IGNORECASE)
+_RE_LEADING_NUMBER = re.compile(r"^\s*\d+\s*")
+_RE_LEADING_THEME = re.compile(r"^тема\s*\d+\.?\s*", re.IGNORECASE)
+# Мягкий перенос вместе с переносом строки либо управляющий символ (в том числе одиночный мягкий перенос)
+_RE_CONTROL_CHARS = re.compile(r'\xad\n|[\u0000-\u0008\u000b\u000c\u000e-\u001f\u007f\u00ad]')
+_RE_HYPHEN_BREAK = re.compile(r"-\n")
+_RE_TABLE_HEADER = re.compile(r"\d+\s*№\s*п/п[\s\S]{0,60}?Содержание")
+_RE_FORBIDDEN_WORDS = re.compile(r"(семинар|тема|темы)", re.IGNORECASE)
+_RE_PARENTHESES = re.compile(r"\([^)]*\)")
+_RE_DIGITS_AND_DOTS = re.compile(r"[.\d]+")
+_RE_LEADING_ENUM = re.compile(r"^\s*\d+[\.\)]*\s*")
+_RE_NUMBER_BEFORE_SPACE = re.compile(r"[0-9]+ ")
 
 
 class ParserLETI:
@@ -22,24 +50,6 @@ class ParserLETI:
         self.endText = "4.2 Перечень лабораторных работ"  # Конец раздела с темами
         self.textWithNameSubject = "РАБОЧАЯ ПРОГРАММА дисциплины"  # Маркер названия дисциплины
 
-    def getTextFromDict(self, textDict):
-        """
-        Извлекает текст из словаря, полученного от PyMuPDF (fitz)
-        Args:
-            textDict: словарь с структурой страницы PDF
-        Returns:
-            строка с текстом страницы
-        """
-        result = []
-        # Проходим по блокам страницы
-        for block in textDict.get("blocks", []):
-            if block.get("type") == 0:  # 0 - текстовый блок
-                for line in block.get("lines", []):
-                    # Склеиваем текст из всех span'ов в линии
-                    lineText = "".join(span.get("text", "") for span in line.get("spans", []))
-                    result.append(lineText)
-        return "\n".join(result)
-
     def getDirection(self, direction: str) -> dict:
         """Метод получения направления"""
         if direction in self.__directionsOfStudy:
@@ -50,6 +60,33 @@ class ParserLETI:
         """Получить все направления"""
         return self.__directionsOfStudy
 
+    def iterPdfPages(self, pdfPath):
+        """
+        Генератор текста страниц PDF, очищенного функцией cleanPdfPageText
+        Args:
+            pdfPath: путь к PDF файлу
+        Returns:
+            текст очередной страницы
+        """
+        # В режиме "text" каждая строка, включая последнюю, уже заканчивается переносом
+        with fitz.open(pdfPath) as doc:
+            for page in doc:
+                yield self.cleanPdfPageText(page.get_text("text", flags=TEXT_FLAGS))
+
+    def tryReadPdf(self, pdfPath):
+        """
+        Обрабатывает один PDF файл, ошибку разбора выводит и не пробрасывает
+        Args:
+            pdfPath: путь к PDF файлу
+        Returns:
+            словарь с данными дисциплины или None при ошибке
+        """
+        try:
+            return self.readPdf(pdfPath)
+        except Exception as e:
+            print(f"Ошибка при обработке {os.path.basename(pdfPath)}: {e}")
+            return None
+
     def readPdf(self, pdfPath):
         """
         Основной метод обработки одного PDF файла
@@ -58,34 +95,26 @@ class ParserLETI:
         Returns:
             словарь с данными дисциплины или None если не удалось распарсить
         """
-        fullText = ""
         subjectName = ""
         listPreviousSubject = []
 
-        doc = fitz.open(pdfPath)
-
-        # Извлекаем текст со всех страниц
-        for page in doc:
-            textDict = page.get_text("dict")
-            pageText = self.getTextFromDict(textDict)
-            fullText += pageText + "\n"
-
-        doc.close()
-
-        # Очищаем текст от спецсимволов PDF
-        fullText = self.cleanPdfText(fullText)
+        # Извлекаем текст со всех страниц, спецсимволы PDF чистим постранично,
+        # а переносы строк склеиваем уже в общем тексте
+        fullText = self.joinPdfLines("".join(self.iterPdfPages(pdfPath)))
 
         # Ищем название дисциплины
-        if fullText.find(self.textWithNameSubject) != -1:
-            startIdx = fullText.find(self.textWithNameSubject) + len(self.textWithNameSubject) + 2
+        markerIdx = fullText.find(self.textWithNameSubject)
+        if markerIdx != -1:
+            startIdx = markerIdx + len(self.textWithNameSubject) + 2
             endIdx = fullText.find("»", startIdx)
             if endIdx != -1:
                 subjectName = fullText[startIdx:endIdx]
                 subjectName = self.normalizeSpaces(subjectName).capitalize()
 
         # Ищем предшествующие дисциплины
-        if fullText.find(self.textForPreviousSubject) != -1:
-            startIdx = fullText.find(self.textForPreviousSubject) + len(self.textForPreviousSubject)
+        markerIdx = fullText.find(self.textForPreviousSubject)
+        if markerIdx != -1:
+            startIdx = markerIdx + len(self.textForPreviousSubject)
             endIdx = fullText.find(self.endTextForPreviousSubject, startIdx)
             if endIdx == -1:
                 endIdx = len(fullText)
@@ -95,19 +124,18 @@ class ParserLETI:
 
             # Регулярка: находим все названия в кавычках «…»
             # «(.*?)» - захват всего что между кавычками
-            listPreviousSubject = re.findall(r'«(.*?)»', subjectBlock)
+            listPreviousSubject = _RE_QUOTED.findall(subjectBlock)
             listPreviousSubject = [self.normalizeSpaces(s) for s in listPreviousSubject]
 
         # Извлекаем блок с темами
         textTopics = ""
-        if self.textForSubjectTopics in fullText:
-            startIdx = fullText.find(self.textForSubjectTopics) + len(self.textForSubjectTopics)
+        markerIdx = fullText.find(self.textForSubjectTopics)
+        if markerIdx != -1:
+            startIdx = markerIdx + len(self.textForSubjectTopics)
             endIdx = fullText.find(self.endText)  # Ищем до начала лабораторных работ
             textTopics = fullText[startIdx:endIdx].strip()
-            # Удаляем "Тема 1", "Тема 1.", "Тема 1.1" и т.д. в любом регистре
-            textTopics = re.sub(r'(?i)тема\s*\d+(\.\d+)*\.?\s*', '', textTopics)
-            # Также удаляем просто "Тема" если осталось
-            textTopics = re.sub(r'(?i)тема\s*', '', textTopics)
+            # Удаляем "Тема 1", "Тема 1.", "Тема 1.1" и т.д., а также просто "Тема" в любом регистре
+            textTopics = _RE_THEME.sub('', textTopics)
 
         # Разбиваем на отдельные темы по номерам
         themes = self.splitByNumberedTopics(self.removeTableHeaders(textTopics))
@@ -120,7 +148,7 @@ class ParserLETI:
 
         filteredThemes = [
             theme for theme in parsed
-            if not list(theme.keys())[0].startswith(("Введение", "Заключение"))
+            if not next(iter(theme)).startswith(("Введение", "Заключение"))
         ]
 
         filtered = self.cleanThemeItems(filteredThemes)
@@ -143,33 +171,31 @@ class ParserLETI:
         """
         directories = self.getDirectories()
 
-        for directoryName in directories:
-            targetDir = os.path.join(self.universityDirName, directoryName)
-            self.directionsOfStudy[directoryName] = []  # Инициализируем список для направления
+        # Сначала находим PDF файлы всех директорий, чтобы запустить один пул на весь проход
+        pdfPathsOfDirectories = {
+            directoryName: self.getPdfPaths(os.path.join(self.universityDirName, directoryName))
+            for directoryName in directories
+        }
+        fileCount = sum(len(pdfPaths) for pdfPaths in pdfPathsOfDirectories.values() if pdfPaths)
 
-            if not os.path.exists(targetDir) or not os.path.isdir(targetDir):
-                print(f"Директория не существует: {targetDir}")
-                continue
+        with ParserPool(self, (self.universityDirName,), fileCount, muteErrors=True) as pool:
+            for directoryName, pdfPaths in pdfPathsOfDirectories.items():
+                self.directionsOfStudy[directoryName] = []  # Инициализируем список для направления
 
-            # Находим все PDF файлы в директории
-            pdfFiles = [
-                f for f in os.listdir(targetDir)
-                if f.lower().endswith(".pdf") and os.path.isfile(os.path.join(targetDir, f))
-            ]
-            if not pdfFiles:
-                print(f"PDF файлы не найдены в директории {directoryName}")
-                continue
+                if pdfPaths is None:
+                    print(f"Директория не существует: {os.path.join(self.universityDirName, directoryName)}")
+                    continue
+
+                if not pdfPaths:
+                    print(f"PDF файлы не найдены в директории {directoryName}")
+                    continue
 
-            print(f"\nНайдено {len(pdfFiles)} PDF файлов в {directoryName}:")
-            for pdfFile in pdfFiles:
-                pdfPath = os.path.join(targetDir, pdfFile)
+                print(f"\nНайдено {len(pdfPaths)} PDF файлов в {directoryName}:")
 
-                try:
-                    pdfData = self.readPdf(pdfPath)
+                # Файлы независимы, поэтому разбираются параллельно; map сохраняет порядок файлов
+                for pdfData in pool.map(ParserLETI.tryReadPdf, pdfPaths):
                     if pdfData:
                         self.directionsOfStudy[directoryName].append(pdfData)
-                except Exception as e:
-                    print(f"Ошибка при обработке {pdfFile}: {e}")
 
         # Сохраняем результат в JSON
         outputFile = os.path.join(self.universityDirName, "all_disciplines.json")
@@ -187,21 +213,21 @@ class ParserLETI:
         Returns:
             список блоков тем
         """
+        # Первое вхождение маркера "1 ", "2 ", "3 " и т.д. для всех номеров за один проход.
+        # Маркер ищется как подстрока, поэтому "1 " встречается и внутри "21 "
+        firstPositions = {}
+        for match in _RE_NUMBER_BEFORE_SPACE.finditer(text):
+            digits = match.group()[:-1]
+            for shift in range(len(digits)):
+                if digits[shift] != "0":
+                    firstPositions.setdefault(int(digits[shift:]), match.start() + shift)
+
         topics = []
         currentNum = 1
 
-        while True:
-            currentMarker = f"{currentNum} "  # "1 ", "2 ", "3 " и т.д.
-            nextMarker = f"{currentNum + 1} "
-
-            startIdx = text.find(currentMarker)
-            if startIdx == -1:
-                break  # Нет даже первого номера конец
-
-            startIdx += len(currentMarker)
-
-
-            endIdx = text.find(nextMarker)
+        while currentNum in firstPositions:  # Нет очередного номера конец
+            startIdx = firstPositions[currentNum] + len(f"{currentNum} ")
+            endIdx = firstPositions.get(currentNum + 1, -1)
 
             if endIdx == -1:
                 # Это последний блок — берём до конца
@@ -227,11 +253,11 @@ class ParserLETI:
             словарь {название_темы: [список_предложений]}
         """
         # Убираем ведущий номер в начале
-        block = re.sub(r"^\s*\d+\s*", "", block)  # регулярка: пробелы, цифры, пробелы
+        block = _RE_LEADING_NUMBER.sub("", block)  # регулярка: пробелы, цифры, пробелы
 
         # Убираем слово "Тема" с номером
-        # (?i) - игнорирование регистра, ^ - начало строки, \d+ - цифры, \.? - точка опционально
-        block = re.sub(r"(?i)^тема\s*\d+\.?\s*", "", block).strip()
+        # IGNORECASE - игнорирование регистра, ^ - начало строки, \d+ - цифры, \.? - точка опционально
+        block = _RE_LEADING_THEME.sub("", block).strip()
 
         # Найти первую точку с пробелом (конец названия темы)
         firstDotIdx = block.find('. ')
@@ -250,6 +276,24 @@ class ParserLETI:
 
         return {title: sentences}
 
+    @staticmethod
+    def getPdfPaths(targetDir: str):
+        """
+        Находит все PDF файлы в директории
+        Args:
+            targetDir: путь к директории
+        Returns:
+            список путей к PDF файлам или None, если директории нет
+        """
+        if not os.path.exists(targetDir) or not os.path.isdir(targetDir):
+            return None
+
+        with os.scandir(targetDir) as entries:
+            return [
+                entry.path for entry in entries
+                if entry.name.lower().endswith(".pdf") and entry.is_file()
+            ]
+
     def getDirectories(self):
         """Получить список всех директорий в папке"""
         directories = []
@@ -258,10 +302,11 @@ class ParserLETI:
             print(f"Папка {self.universityDirName} не существует")
             return directories
 
-        for item in os.listdir(self.universityDirName):
-            itemPath = os.path.join(self.universityDirName, item)
-            if os.path.isdir(itemPath):
-                directories.append(item)
+        with os.scandir(self.universityDirName) as entries:
+            for entry in entries:
+                # Скрытые папки (например, кэш других парсеров) не являются направлениями
+                if entry.is_dir() and not entry.name.startswith("."):
+                    directories.append(entry.name)
 
         return directories
 
@@ -271,61 +316,40 @@ class ParserLETI:
         Заменяет все пробельные символы на один пробел
         """
         # \s+ - один или более пробельных символов (пробел, таб, перенос строки)
-        return re.sub(r'\s+', ' ', s).replace("\xad", " ").replace(" \n", "").strip()
+        return _RE_WS.sub(' ', s).replace("\xad", " ").replace(" \n", "").strip()
 
     @staticmethod
     def cleanPdfSpaces(text: str) -> str:
         """
         Преобразует все спец-пробелы PDF в обычные пробелы
         """
-        # Список юникод-символов пробелов, которые часто встречаются в PDF
-        pdfSpaces = [
-            "\u00A0",  # неразрывный пробел
-            "\u2000", "\u2001", "\u2002", "\u2003", "\u2004",  # пробелы разной ширины
-            "\u2005", "\u2006", "\u2007", "\u2008", "\u2009", "\u200A",
-            "\u202F", "\u205F", "\u3000",  # узкие и широкие пробелы
-            "\xad", "\u00AD",  # мягкий перенос (soft hyphen)
-            "\u200B"  # zero-width space
-        ]
-        for space in pdfSpaces:
-            text = text.replace(space, " ")
-
-        # Заменяем множественные пробелы на один
-        text = re.sub(r"[ ]+", " ", text)
+        # Заменяем спец-пробелы и множественные пробелы на один обычный за один проход
+        text = _RE_SPACES.sub(" ", text)
         return text.strip()
 
     @staticmethod
-    def cleanPdfText(s: str) -> str:
+    def cleanPdfPageText(s: str) -> str:
         """
-        Комплексная очистка текста от PDF-спецсимволов
+        Удаляет PDF-спецсимволы, не затрагивая переносы строк между словами
+        Каждая замена не выходит за пределы строки, поэтому применяется к страницам по отдельности
         """
-        pdfSpaces = [
-            "\u00A0", "\u2000", "\u2001", "\u2002", "\u2003", "\u2004",
-            "\u2005", "\u2006", "\u2007", "\u2008", "\u2009", "\u200A",
-            "\u202F", "\u205F", "\u3000", "\u00AD", "\u200B"
-        ]
-
-        # Удаляем мягкий перенос с переносом строки
-        s = re.sub(r'\xad\n', '', s)
-        s = s.replace("\u00AD", "")
+        # Удаляем мягкий перенос с переносом строки и управляющие символы (диапазоны юникода) за один проход
+        s = _RE_CONTROL_CHARS.sub('', s)
 
-        # Удаляем управляющие символы (диапазоны юникода)
-        s = re.sub(r'[\u0000-\u0008\u000b\u000c\u000e-\u001f\u007f\u00ad]', '', s)
-
-        # Заменяем спец-пробелы на обычные
-        for space in pdfSpaces:
-            s = s.replace(space, " ")
+        # Остальные спец-пробелы PDF входят в \s и схлопываются финальной нормализацией,
+        # отдельно заменять нужно только zero-width space
+        return s.replace("\u200B", " ")
 
+    @staticmethod
+    def joinPdfLines(s: str) -> str:
+        """
+        Склеивает строки текста, очищенного cleanPdfPageText, и нормализует пробелы
+        """
         # Склеиваем слова, разорванные дефисом с переносом строки
-        s = re.sub(r"-\n", "", s)
-
-        # Заменяем одиночные переносы строк на пробелы
-        # (?<!\n)\n(?!\n) - перенос строки, у которого нет соседей-переносов
-        s = re.sub(r"(?<!\n)\n(?!\n)", " ", s)
+        s = _RE_HYPHEN_BREAK.sub("", s)
 
-        # Нормализуем пробелы
-        s = re.sub(r"\s+", " ", s)
-        return s.strip()
+        # Остальные переносы строк (одиночные и двойные) вместе с пробелами схлопываем в один пробел
+        return " ".join(s.split())
 
 
 
@@ -335,8 +359,7 @@ class ParserLETI:
         Удаляет заголовки таблиц из текста
         Регулярка: цифры, пробелы, №, п/п, затем до 60 любых символов, затем Содержание
         """
-        pattern = r"\d+\s*№\s*п/п[\s\S]{0,60}?Содержание"
-        return re.sub(pattern, "", text)
+        return _RE_TABLE_HEADER.sub("", text)
 
     def cleanThemeItems(self, themes):
         """
@@ -348,47 +371,45 @@ class ParserLETI:
         """
         cleaned = []
 
-        # Слова, которые нужно удалить (в любом регистре)
-        forbiddenWords = r"(семинар|тема|темы)"
-
         for theme in themes:
             newTheme = {}
             for title, content in theme.items():
                 newContent = []
                 for line in content:
 
-                    # Удаляем запрещённые слова
-                    line = re.sub(forbiddenWords, "", line, flags=re.IGNORECASE)
+                    # Удаляем запрещённые слова (семинар, тема, темы в любом регистре)
+                    line = _RE_FORBIDDEN_WORDS.sub("", line)
 
 
                     # \([^)]*\) - открывающая скобка, любые символы кроме ), закрывающая скобка
-                    line = re.sub(r"\([^)]*\)", "", line)
+                    line = _RE_PARENTHESES.sub("", line)
 
                     # Удаляем строки короче 3 символов
-                    if len(line.strip()) < 3:
+                    stripped = line.strip()
+                    if len(stripped) < 3:
                         continue
 
                     # Удаляем строки, состоящие только из цифр и/или точек
                     # [.\d]+ - один или более символов из набора (точка, цифра)
-                    if re.fullmatch(r"[.\d]+", line.strip()):
+                    if _RE_DIGITS_AND_DOTS.fullmatch(stripped):
                         continue
 
                     # Удаляем нумерацию в начале строки
                     # ^\s*\d+[\.\)]*\s* - пробелы, цифры, точка или скобка, пробелы
-                    line = re.sub(r"^\s*\d+[\.\)]*\s*", "", line)
+                    line = _RE_LEADING_ENUM.sub("", line)
 
                     # Удаляем знаки препинания (иногда остаются висячими)
                     line = line.replace(":", "").replace(";", "").replace("+", "")
 
-                    # Финальная нормализация
-                    line = self.normalizeSpaces(line).strip()
-                    if not line or len(line.strip()) < 3:
+                    # Финальная нормализация (normalizeSpaces уже обрезает пробелы по краям)
+                    line = self.normalizeSpaces(line)
+                    if len(line) < 3:
                         continue
 
                     newContent.append(line)
 
                 newTheme[title] = newContent
-                cleaned.append(newTheme)
+            cleaned.append(newTheme)
 
         return cleaned
 
@@ -2,6 +2,15 @@ import fitz #MyPyPDF
 import os
 import json
 import re
+from parserCommon import TEXT_FLAGS, ParserPool
+
+_RE_BULLET = re.compile(r'^[•\-*\●·\s]+')
+_RE_ETC = re.compile(r'т\.\s*([дп])\.', re.IGNORECASE)
+_RE_SENTENCE_END = re.compile(r'\.\s+')
+_RE_LEADING_NUMBER = re.compile(r'^\d+\.?\d*\s*')
+_RE_TOPIC = re.compile(r'(?:Раздел|Тема)\s*(\d+)[\.:\-]?\s*(.*?)(?=(?:Раздел|Тема)\s*\d+|\Z)',
+                       re.DOTALL | re.IGNORECASE)
+_RE_FILENAME_JUNK = re.compile(r'[B0-9._]+')
 
 
 class ParserMPU:
@@ -40,12 +49,15 @@ class ParserMPU:
             print(f"Папка не найдена: {directory}")
             return False
 
+        with os.scandir(directory) as entries:
+            fileNames = [entry.name for entry in entries if entry.name.lower().endswith('.pdf') and entry.is_file()]
+        filePaths = [os.path.join(directory, fileName) for fileName in fileNames]
+
         listOfDisciplines = []
-        for fileName in os.listdir(directory):
-            if fileName.lower().endswith('.pdf'):
-                filePath = os.path.join(directory, fileName)
+        with ParserPool(self, (self.__universityDirName,), len(filePaths), muteErrors=True) as pool:
+            results = pool.map(ParserMPU._read_discipline_file, filePaths)
+            for fileName, (discipline, arguments) in zip(fileNames, results):
                 print(f"Файл: {fileName}")
-                discipline, arguments = self._read_discipline_file(filePath)
                 if discipline and arguments:
                     listOfDisciplines.append({discipline: arguments})
                     if arguments.get("nextDisciplines"):
@@ -77,35 +89,30 @@ class ParserMPU:
     @staticmethod
     def _clean_text(text: str) -> str:
         """Убирает лишние пробелы."""
-        return re.sub(r'\s+', ' ', text).strip()
+        return ' '.join(text.split())
 
     @staticmethod
     def _check_text(text: str) -> bool:
         """Проверяет, что текст содержит буквы и что он достаточной длины."""
         if not text or len(text) < 3:
             return False
-        return any(c.isalpha() for c in text)
+        return any(map(str.isalpha, text))
 
     def _extract_text_from_pdf(self, filePath: str) -> str:
         """Извлекает текст из PDF-файла."""
         try:
-            doc = fitz.open(filePath)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-                text += "\n"
-            doc.close()
-            return text
+            parts = []
+            with fitz.open(filePath) as doc:
+                for page in doc:
+                    parts.append(page.get_text("text", flags=TEXT_FLAGS))
+                    parts.append("\n")
+            return "".join(parts)
         except Exception as e:
             print(f"Ошибка чтения Pdf: {e}")
             return ""
 
-    def _extract_discipline_name(self, full_text: str) -> str:
-        """Извлекает название дисциплины."""
-        title_pos = full_text.find(self.__titleOfDocument)
-        if title_pos == -1:
-            return ""
-
+    def _extract_discipline_name(self, full_text: str, title_pos: int) -> str:
+        """Извлекает название дисциплины, идущее после заголовка на позиции title_pos."""
         after_title = full_text[title_pos + len(self.__titleOfDocument):]
         dir_pos = after_title.find(self.__disciplineNameEndMarker)
         if dir_pos != -1:
@@ -153,8 +160,8 @@ class ParserMPU:
             line = line.strip()
             if not line:
                 continue
-            if line and (line[0] in '•-*●·' or line.startswith('- ') or line.startswith('* ')):
-                clean = re.sub(r'^[•\-*\●·\s]+', '', line).strip()
+            if line[0] in '•-*●·':  # строка списка с маркером
+                clean = _RE_BULLET.sub('', line).strip()
                 clean = clean.rstrip(';')
                 if self._check_text(clean):
                     next_disciplines.append(clean)
@@ -174,19 +181,18 @@ class ParserMPU:
 
         text = text.replace('\n', ' ')
 
-        text = re.sub(r'т\.\s*д\.', 'ТД', text, flags=re.IGNORECASE)
-        text = re.sub(r'т\.\s*п\.', 'ТП', text, flags=re.IGNORECASE)
-        text = re.sub(r'и\.\s*т\.\s*д\.', 'ИТД', text, flags=re.IGNORECASE)
-        text = re.sub(r'и\.\s*т\.\s*п\.', 'ИТП', text, flags=re.IGNORECASE)
+        # "т.д." и "т.п." (в том числе внутри "и т.д.") прячем от разбиения по точкам
+        text = _RE_ETC.sub(lambda match: 'ТД' if match.group(1) in 'дД' else 'ТП', text)
 
-        sentences = re.split(r'\.\s+', text)
+        sentences = _RE_SENTENCE_END.split(text)
 
-        sentences = [s.replace('ТД', 'т.д.').replace('ТП', 'т.п.').replace('ИТД', 'и т.д.').replace('ИТП', 'и т.п.') for s in sentences]
+        if 'ТД' in text or 'ТП' in text:
+            sentences = [s.replace('ТД', 'т.д.').replace('ТП', 'т.п.') for s in sentences]
 
         result = []
         for sent in sentences:
             sent = sent.strip()
-            sent = re.sub(r'^\d+\.?\d*\s*', '', sent)
+            sent = _RE_LEADING_NUMBER.sub('', sent)
             sent = self._clean_text(sent)
             if self._check_text(sent) and len(sent) > 5:
                 result.append(sent)
@@ -216,12 +222,7 @@ class ParserMPU:
 
         content_text = full_text[content_pos:end_pos]
 
-        topic_pattern = re.compile(
-            r'(?s)(?:Раздел|Тема)\s*(\d+)[\.:\-]?\s*(.*?)(?=(?:Раздел|Тема)\s*\d+|\Z)',
-            re.IGNORECASE
-        )
-
-        for match in topic_pattern.finditer(content_text):
+        for match in _RE_TOPIC.finditer(content_text):
             topic_content = match.group(2).strip()
             sentences = self._split_into_sentences(topic_content)
             if sentences:
@@ -239,13 +240,14 @@ class ParserMPU:
             if not full_text:
                 return None, None
 
-            if self.__titleOfDocument not in full_text:
+            title_pos = full_text.find(self.__titleOfDocument)
+            if title_pos == -1:
                 return None, None
 
-            name = self._extract_discipline_name(full_text)
+            name = self._extract_discipline_name(full_text, title_pos)
             if not name:
                 name = os.path.basename(filePath).replace('.pdf', '')
-                name = re.sub(r'[B0-9._]+', '', name)
+                name = _RE_FILENAME_JUNK.sub('', name)
                 name = name.replace('_', ' ').strip()
 
             next_disc = self._extract_next_disciplines(full_text)
@@ -2,6 +2,15 @@ import fitz
 import os
 import json
 import re
+from parserCommon import ParserPool
+
+# Флаги "dict" без картинок: блоки изображений нам не нужны, а их байты копируются в каждый словарь
+_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+_RE_NEWLINE_CAP = re.compile(r'\n(?=[А-ЯA-Z])')
+_RE_DECIMAL = re.compile(r'\d+\.\d+')
+_RE_NUMBERED_ITEM = re.compile(r'\d+\)\s*(\S+)')
+_RE_NUMBER_DOT = re.compile(r'\d+\.')
 
 
 class ParserSpbPU:
@@ -33,6 +42,7 @@ class ParserSpbPU:
         self.__textForPreviousDisciplines = "Изучение дисциплины базируется на результатах освоения " \
                                             "следующих дисциплин: \n"
         self.__titleOfDocument = "РАБОЧАЯ ПРОГРАММА ДИСЦИПЛИНЫ (МОДУЛЯ) \n"
+        self.__wordsOfTitle = self.__titleOfDocument.split()
         self.__textForEducationalUnits = "4.2. Содержание разделов и результаты изучения дисциплины \n" \
                                          "Раздел дисциплины Содержание \n"
         self.__endTextForEducationalUnits = "5. Образовательные технологии"
@@ -47,11 +57,12 @@ class ParserSpbPU:
             print(directory)
             return False
 
+        with os.scandir(directory) as entries:
+            filePaths = [entry.path for entry in entries if entry.is_file()]
+
         listOfDisciplines = []
-        for fileNameDiscipline in os.listdir(directory):
-            filePathDiscipline = os.path.join(directory, fileNameDiscipline)
-            if os.path.isfile(filePathDiscipline):
-                discipline, arguments = self.readTextFromFileDiscipline(filePathDiscipline)
+        with ParserPool(self, (self.__universityDirName,), len(filePaths)) as pool:
+            for discipline, arguments in pool.map(ParserSpbPU.readTextFromFileDiscipline, filePaths):
                 if discipline and arguments:
                     listOfDisciplines.append({discipline: arguments})
         self.__directionsOfStudy[dirOfDirection] = listOfDisciplines
@@ -79,11 +90,11 @@ class ParserSpbPU:
     @staticmethod
     def __refactorText(text: str) -> str:
         """Метод обработки текста для учебных единиц"""
-        text = re.sub(r'\n(?=[А-ЯA-Z])', '$', text)
-        text = re.sub(r'\d+\.\d+', '', text)
-        text = re.sub(r'Темы:', '', text)
-        text = re.sub(r'\s+', ' ', text).strip()
-        text = re.sub(r'\d+\)\s*(\S+)', '', text)
+        text = _RE_NEWLINE_CAP.sub('$', text)
+        text = _RE_DECIMAL.sub('', text)
+        text = text.replace('Темы:', '')
+        text = ' '.join(text.split())
+        text = _RE_NUMBERED_ITEM.sub('', text)
         text = text.replace(". ", "$").replace(";", "$")
         text = text.replace(".", "")
         return text
@@ -91,77 +102,107 @@ class ParserSpbPU:
     @staticmethod
     def __checkText(text: str) -> bool:
         """Проверка корретной информации"""
-        flag = False
-        for el in text:
-            if el.isalpha():
-                flag = True
-                break
-        return flag and len(text.strip()) > 2
+        return len(text.strip()) > 2 and any(map(str.isalpha, text))
+
+    @staticmethod
+    def __findEnd(text: str, subString: str, start: int) -> int:
+        """Граница среза по find от позиции start; если не найдено - без последнего символа, как срез по -1"""
+        position = text.find(subString, start)
+        return position if position != -1 else len(text) - 1
+
+    def __hasWordsOfTitle(self, text: str) -> bool:
+        """Проверка, что на странице есть все слова заголовка"""
+        return all(word in text for word in self.__wordsOfTitle)
 
     def readTextFromFileDiscipline(self, filePathDiscipline: str) -> tuple:
         """Прочитать учебный план направления из файла и вернуть информацию"""
         try:
-            fullText = ""
             document = fitz.open(filePathDiscipline)
-            linesBoldFont = []
 
-            for page_num in range(len(document)):
-                page = document[page_num]
+            # Слой текста строим один раз: сначала ищем слова заголовка в простом тексте страниц
+            # и только для дисциплин собираем дорогие словари
+            pages = []
+            for page in document:
+                textLayer = page.get_textpage(flags=_TEXT_FLAGS)
+                pages.append((page, textLayer))
+                if self.__hasWordsOfTitle(page.get_text("text", textpage=textLayer)):
+                    break
+            else:
+                document.close()
+                print(f"{filePathDiscipline}: this is not discipline!")
+                return None, None
 
-                textPage = page.get_text("dict")
-                for block in textPage.get("blocks", []):
-                    if "lines" in block:
-                        for line in block["lines"]:
-                            for span in line["spans"]:
-                                fullText += span["text"] + " "
-                                if span["flags"] == 20:
-                                    linesBoldFont.append(span["text"].strip())
-                        fullText += "\n"
+            parts = []
+            linesBoldFont = set()
 
-                fullText += "\n"
+            # Читаем все страницы: жирные строки с любой страницы участвуют в поиске тем раздела 4.2
+            for pageNumber in range(len(document)):
+                if pageNumber < len(pages):
+                    page, textLayer = pages[pageNumber]
+                else:
+                    page = document[pageNumber]
+                    textLayer = page.get_textpage(flags=_TEXT_FLAGS)
+
+                pageParts = []
+                textPage = page.get_text("dict", textpage=textLayer)
+                for block in textPage["blocks"]:
+                    if block["type"] != 0:  # не текстовый блок
+                        continue
+                    for line in block["lines"]:
+                        for span in line["spans"]:
+                            text = span["text"]
+                            pageParts.append(text)
+                            pageParts.append(" ")
+                            if span["flags"] == 20:
+                                linesBoldFont.add(text.strip())
+                    pageParts.append("\n")
+
+                pageParts.append("\n")
+                parts.append("".join(pageParts))
 
             document.close()
-            if self.__titleOfDocument not in fullText:
+            fullText = "".join(parts)
+            indexOfNameDiscipline = fullText.find(self.__titleOfDocument)
+            if indexOfNameDiscipline == -1:
                 print(f"{filePathDiscipline}: this is not discipline!")
                 return None, None
 
-            indexOfNameDiscipline = fullText.find(self.__titleOfDocument)
-            disciplineName = fullText[indexOfNameDiscipline + len(self.__titleOfDocument):]
-            disciplineName = disciplineName[1:disciplineName.find("»")].strip()
+            startOfName = indexOfNameDiscipline + len(self.__titleOfDocument)
+            disciplineName = fullText[startOfName + 1:self.__findEnd(fullText, "»", startOfName)].strip()
 
             indexOfPreviousDisciplines = fullText.find(self.__textForPreviousDisciplines)
             listOfPreviousDisciplines = []
             if indexOfPreviousDisciplines != -1:
-                subText = fullText[indexOfPreviousDisciplines + len(self.__textForPreviousDisciplines):]
-                subText = subText[:subText.find("•")]
+                startOfPrevious = indexOfPreviousDisciplines + len(self.__textForPreviousDisciplines)
+                subText = fullText[startOfPrevious:self.__findEnd(fullText, "•", startOfPrevious)]
                 for discipline in subText.split("\n"):
                     if self.__checkText(discipline):
                         listOfPreviousDisciplines.append(discipline.strip())
 
             resultForAllTopics = {}
             indexOfEducationalUnits = fullText.find(self.__textForEducationalUnits)
-            subText = fullText[indexOfEducationalUnits + len(self.__textForEducationalUnits):]
-            subText = subText[:subText.find(self.__endTextForEducationalUnits)]
+            startOfUnits = indexOfEducationalUnits + len(self.__textForEducationalUnits)
+            subText = fullText[startOfUnits:self.__findEnd(fullText, self.__endTextForEducationalUnits, startOfUnits)]
             lines = subText.split("\n")
             nameTopic = ""
             listOfEducationalUnits = []
-            textOfEducationalUnits = ""
+            partsOfEducationalUnits = []
             flagTopic = False
             flagUnits = False
             for i, line in enumerate(lines):
                 if line.strip() in linesBoldFont or i == len(lines) - 1:
                     if (flagTopic and flagUnits) or i == len(lines) - 1:
-                        textOfEducationalUnits = self.__refactorText(textOfEducationalUnits)
+                        textOfEducationalUnits = self.__refactorText("".join(partsOfEducationalUnits))
                         for unit in textOfEducationalUnits.split("$"):
                             if self.__checkText(unit):
                                 listOfEducationalUnits.append(unit.strip())
                         if nameTopic and listOfEducationalUnits and nameTopic[0].isdigit():
                             nameTopic = nameTopic[nameTopic.find(". ") + 2:]
-                            nameTopic = re.sub(r'\d+\.', '', nameTopic)
+                            nameTopic = _RE_NUMBER_DOT.sub('', nameTopic)
                             resultForAllTopics[nameTopic.strip()] = listOfEducationalUnits
                     if flagUnits:
                         nameTopic = ""
-                        textOfEducationalUnits = ""
+                        partsOfEducationalUnits = []
                         listOfEducationalUnits = []
                         flagUnits = False
                     if line and line[0].isdigit():
@@ -169,7 +210,8 @@ class ParserSpbPU:
                     nameTopic += line
                     flagTopic = True
                 else:
-                    textOfEducationalUnits += line + "\n"
+                    partsOfEducationalUnits.append(line)
+                    partsOfEducationalUnits.append("\n")
                     flagUnits = True
 
             return disciplineName, {